@@ -1,15 +1,84 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import datetime
 import smtplib
 import email.utils
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from email.header import Header
-from openai import OpenAI
-import xml.etree.ElementTree as ET
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError, BadRequestError
+import lxml.etree as LET
+import asyncio
+import random
+import json
+import hashlib
+import diskcache
 import os
 
 
+# arXiv Atom 响应使用的命名空间
+NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom'
+}
+
+# Clark 记法的命名空间前缀，直接拼接成完整标签名，无需再解析前缀
+ATOM = '{http://www.w3.org/2005/Atom}'
+OPENSEARCH = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+ARXIV_API_URL = 'http://export.arxiv.org/api/query?'
+# 每页请求的结果数，超过后分页并发获取
+PAGE_SIZE = 100
+
+# 预编译的 XPath 表达式，避免在解析每个 entry 时重复编译路径
+X_TITLE = LET.XPath('./atom:title/text()', namespaces=NS)
+X_SUMMARY = LET.XPath('./atom:summary/text()', namespaces=NS)
+X_ID = LET.XPath('./atom:id/text()', namespaces=NS)
+X_PUBLISHED = LET.XPath('./atom:published/text()', namespaces=NS)
+X_AUTHORS = LET.XPath('./atom:author/atom:name/text()', namespaces=NS)
+X_CATS = LET.XPath('./atom:category/@term', namespaces=NS)
+X_COMMENT = LET.XPath('./arxiv:comment/text()', namespaces=NS)
+
+# 计算机科学领域分类的前缀
+CS_PREFIX = 'cs.'
+
+# 所有 arXiv 请求共享的会话，复用 TCP 连接，并对临时错误自动重试
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      raise_on_status=False))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+# 向 arXiv 标明客户端身份；requests 默认已请求 gzip 压缩，iter_content 会在流式读取时自动解压
+SESSION.headers.update({
+    'User-Agent': 'arxiv-assistant/1.0',
+})
+
+# 按 (api_key, api_base) 缓存的同步/异步客户端，所有调用共享同一个连接池
+_client_cache = {}
+_async_client_cache = {}
+
+# AI处理结果的磁盘缓存目录，重复运行时相同的摘要无需再次请求
+LLM_CACHE_DIR = os.path.expanduser(
+    os.environ.get("LLM_CACHE_DIR", "~/.cache/arxiv_assistant"))
+# 缓存有效期（秒）
+LLM_CACHE_EXPIRE = 30 * 86400
+_llm_cache = None
+# 缓存未命中的哨兵值，与缓存中可能存在的空字符串等结果区分
+_MISS = object()
+
+# 送入AI前摘要的最大字符数，arXiv摘要一般不超过这个长度
+MAX_ABSTRACT_CHARS = 3000
+# 一句话贡献要点的最大生成token数
+CONTRIBUTION_MAX_TOKENS = 128
+
+# 进行中的AI请求，键与磁盘缓存相同，用于合并同一次运行中的重复请求
+_inflight = {}
+
+
 def get_yesterday():
     """
     获取前一天的日期
@@ -19,90 +88,235 @@ def get_yesterday():
     return yesterday.strftime('%Y-%m-%d')
 
 
-def search_arxiv_papers(search_term, target_date, max_results=10):
+def iter_arxiv_entries(response, feed_info=None, chunk_size=65536):
+    """
+    将流式响应分块喂给增量解析器，每解析完一个 entry 就立即产出，使下载和解析重叠进行
+
+    参数:
+    response (requests.Response): 以 stream=True 发起的响应
+    feed_info (dict, optional): 解析到 opensearch:totalResults 时写入 'total_results'
+    chunk_size (int): 每次读取的字节数
+
+    返回:
+    generator: 逐个产出的 Atom entry 元素，调用方处理完后即被释放
+    """
+    parser = LET.XMLPullParser(events=('end',), tag=(OPENSEARCH + 'totalResults', ATOM + 'entry'))
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        parser.feed(chunk)
+        for _, entry in parser.read_events():
+            # totalResults 位于所有 entry 之前
+            if entry.tag == OPENSEARCH + 'totalResults':
+                if feed_info is not None:
+                    feed_info['total_results'] = int(entry.text)
+                continue
+
+            yield entry
+
+            # 释放已处理的entry及其之前的兄弟节点
+            entry.clear()
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+
+
+def build_arxiv_query(search_term, target_date, date_filter=False):
+    """
+    构造 arXiv 的 search_query，限定计算机科学领域
+
+    date_filter 为 True 时只匹配 target_date 当天提交的论文，日期范围直接交给 arXiv 服务端过滤
     """
-    在 arXiv 按照关键词查找特定日期的计算机科学（CS）领域论文，并提取标题、作者、摘要、分类和评论等信息
+    query = f'all:{search_term}+AND+cat:cs.*'
+    if date_filter:
+        d = target_date.replace('-', '')
+        query += f'+AND+submittedDate:[{d}0000+TO+{d}2359]'
+    return query
+
+
+def fetch_arxiv_page(query, start, page_size, target_date, date_filter=False):
+    """
+    获取并解析一页 arXiv 搜索结果，提取标题、作者、摘要、分类和评论等信息
+
+    参数:
+    query (str): build_arxiv_query 构造的查询
+    start (int): 本页第一条结果的偏移量
+    page_size (int): 本页最多返回的结果数
+    target_date (str): 目标日期
+    date_filter (bool): 是否只保留 target_date 当天提交的论文
+
+    返回:
+    tuple: (papers, total_results, reached_end)，total_results 为匹配的结果总数，
+           reached_end 表示已出现早于目标日期的论文，后面的页无需再获取
     """
     papers = []
+    feed_info = {'total_results': 0}
+    reached_end = False
 
-    base_url = 'http://export.arxiv.org/api/query?'
-    # 限定计算机科学领域
-    search_query = f'search_query=all:{search_term}+AND+cat:cs.*&start=0&max_results={max_results}&sortBy=submittedDate&sortOrder=descending'
-    response = requests.get(base_url + search_query)
+    search_query = f'search_query={query}&start={start}&max_results={page_size}&sortBy=submittedDate&sortOrder=descending'
+    # 流式获取响应，边下载边解析
+    response = SESSION.get(ARXIV_API_URL + search_query, stream=True)
 
     if response.status_code != 200:
         print("请求失败，请检查你的查询参数。")
-        return []
+        response.close()
+        return [], 0, True
+
+    with response:
+        # 逐条解析entry，不在内存中构建完整的DOM
+        for entry in iter_arxiv_entries(response, feed_info):
+            # 获取分类，不属于计算机科学领域的条目直接跳过，不再提取其他字段
+            categories = [str(term) for term in X_CATS(entry)]
+            if not any(category.startswith(CS_PREFIX) for category in categories):
+                continue
+
+            # 获取发布日期
+            pub_date_str = X_PUBLISHED(entry)[0]
+            pub_date = datetime.datetime.strptime(
+                pub_date_str, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
+
+            # 判断文章的发布日期是否为目标日期，服务端已过滤，这里作为兜底
+            if date_filter and pub_date != target_date:
+                # 结果按提交日期降序排列，出现更早的论文说明后面不会再有目标日期的论文
+                if pub_date < target_date:
+                    reached_end = True
+                    break
+                continue
+
+            # 获取标题
+            title = X_TITLE(entry)[0].strip()
+
+            # 获取摘要
+            summary = X_SUMMARY(entry)[0].strip()
+
+            # 获取链接
+            url = X_ID(entry)[0].strip()
+
+            # 获取作者
+            authors = [name.strip() for name in X_AUTHORS(entry)]
+
+            # 获取ArXiv ID
+            arxiv_id = url.split('/')[-1]
+
+            # 获取评论 (comments)
+            comments = None
+            comments_text = X_COMMENT(entry)
+            if comments_text:
+                comments = comments_text[0].strip()
+
+            papers.append({
+                'title': title,
+                'authors': authors,
+                'url': url,
+                'arxiv_id': arxiv_id,
+                'pub_date': pub_date,
+                'summary': summary,
+                'categories': categories,
+                'comments': comments,  # 添加评论字段
+            })
+
+    return papers, feed_info['total_results'], reached_end
+
+
+async def search_arxiv_papers_async(search_term, target_date, max_results=10, date_filter=False, sem=None):
+    """
+    在 arXiv 按照关键词查找特定日期的计算机科学（CS）领域论文
+
+    先获取第一页并读取 opensearch:totalResults，据此算出还需要的页数，
+    其余各页在线程池中并发获取
+
+    参数:
+    search_term (str): 关键词
+    target_date (str): 目标日期
+    max_results (int): 最多返回的论文数量
+    date_filter (bool): 是否只保留 target_date 当天提交的论文
+    sem (asyncio.Semaphore, optional): 限制同时向 arXiv 发出的请求数
+
+    返回:
+    list: 论文字典列表
+    """
+    sem = sem or asyncio.Semaphore(3)
+    query = build_arxiv_query(search_term, target_date, date_filter)
 
-    # 解析XML响应
-    root = ET.fromstring(response.content)
+    async def fetch_page(start):
+        async with sem:
+            return await asyncio.to_thread(
+                fetch_arxiv_page, query, start,
+                min(PAGE_SIZE, max_results - start), target_date, date_filter)
 
-    # 定义命名空间
-    namespaces = {
-        'atom': 'http://www.w3.org/2005/Atom',
-        'arxiv': 'http://arxiv.org/schemas/atom'
-    }
+    papers, total_results, reached_end = await fetch_page(0)
 
-    # 获取所有条目
-    entries = root.findall('.//atom:entry', namespaces)
+    if not reached_end:
+        remaining = min(max_results, total_results)
+        pages = await asyncio.gather(*[fetch_page(start)
+                                       for start in range(PAGE_SIZE, remaining, PAGE_SIZE)])
+        for page_papers, _, _ in pages:
+            papers.extend(page_papers)
 
-    if not entries:
+    if not papers:
         print("没有找到与搜索词匹配的论文。")
-        return []
-
-    for entry in entries:
-        # 获取标题
-        title = entry.find('./atom:title', namespaces).text.strip()
-
-        # 获取摘要
-        summary = entry.find('./atom:summary', namespaces).text.strip()
-
-        # 获取链接
-        url = entry.find('./atom:id', namespaces).text.strip()
-
-        # 获取发布日期
-        pub_date_str = entry.find('./atom:published', namespaces).text
-        pub_date = datetime.datetime.strptime(
-            pub_date_str, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
-
-        # 获取作者
-        authors = []
-        for author in entry.findall('./atom:author', namespaces):
-            author_name = author.find('./atom:name', namespaces).text.strip()
-            authors.append(author_name)
-
-        # 获取ArXiv ID
-        arxiv_id = url.split('/')[-1]
-
-        # 获取分类
-        categories = []
-        for category in entry.findall('./atom:category', namespaces):
-            category_term = category.get('term')
-            categories.append(category_term)
-
-        # 获取评论 (comments)
-        comments = None
-        comments_elem = entry.find('./arxiv:comment', namespaces)
-        if comments_elem is not None and comments_elem.text:
-            comments = comments_elem.text.strip()
-
-        # 判断文章的发布日期是否为目标日期
-        # if pub_date == target_date:
-        papers.append({
-            'title': title,
-            'authors': authors,
-            'url': url,
-            'arxiv_id': arxiv_id,
-            'pub_date': pub_date,
-            'summary': summary,
-            'categories': categories,
-            'comments': comments,  # 添加评论字段
-        })
 
     return papers
 
 
-def process_with_openai(text, prompt_template, openai_api_key, model_name="gpt-3.5-turbo", api_base=None):
+def search_arxiv_papers(search_term, target_date, max_results=10, date_filter=False):
+    """
+    search_arxiv_papers_async 的同步版本
+    """
+    return asyncio.run(search_arxiv_papers_async(search_term, target_date, max_results, date_filter))
+
+
+async def search_all_terms_async(search_terms, target_date, max_results=10, concurrency=3, date_filter=False):
+    """
+    并发搜索多个关键词，所有关键词的分页请求共享同一个并发限制
+
+    参数:
+    search_terms (list): 关键词列表
+    target_date (str): 目标日期
+    max_results (int): 每个关键词最多返回的论文数量
+    concurrency (int): 同时向 arXiv 发出的最大请求数，避免对服务器造成压力
+    date_filter (bool): 是否只保留 target_date 当天提交的论文
+
+    返回:
+    dict: 关键词到论文列表的映射
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    results = await asyncio.gather(*[
+        search_arxiv_papers_async(term, target_date, max_results, date_filter, sem)
+        for term in search_terms
+    ])
+    return dict(zip(search_terms, results))
+
+
+def get_llm_cache():
+    """
+    获取AI处理结果的磁盘缓存，首次使用时打开
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = diskcache.Cache(LLM_CACHE_DIR)
+    return _llm_cache
+
+
+def llm_cache_key(model_name, prompt_template, text):
+    """
+    根据模型、提示词模板和输入文本生成缓存键
+    """
+    return hashlib.sha256(f"{model_name}|{prompt_template}|{text}".encode()).hexdigest()
+
+
+def get_client(openai_api_key, api_base=None):
+    """
+    获取共享的OpenAI客户端，相同配置只创建一次
+    """
+    key = (openai_api_key, api_base)
+    if key not in _client_cache:
+        client_kwargs = {"api_key": openai_api_key}
+        if api_base:
+            client_kwargs["base_url"] = api_base
+        _client_cache[key] = OpenAI(**client_kwargs)
+    return _client_cache[key]
+
+
+def process_with_openai(text, prompt_template, openai_api_key, model_name="gpt-3.5-turbo", api_base=None, max_tokens=1024):
     """
     使用OpenAI处理文本（翻译或生成摘要）
 
@@ -112,6 +326,7 @@ def process_with_openai(text, prompt_template, openai_api_key, model_name="gpt-3
     openai_api_key (str): OpenAI API密钥
     model_name (str): 使用的模型名称
     api_base (str, optional): 自定义API基础URL
+    max_tokens (int): 生成的最大token数
 
     返回:
     str: 处理后的文本
@@ -119,13 +334,16 @@ def process_with_openai(text, prompt_template, openai_api_key, model_name="gpt-3
     # 构建prompt
     prompt = prompt_template.format(text=text)
 
-    try:
-        # 配置OpenAI客户端
-        client_kwargs = {"api_key": openai_api_key}
-        if api_base:
-            client_kwargs["base_url"] = api_base
+    # 命中缓存则直接返回
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(model_name, prompt_template, text)
+    cached = cache.get(cache_key, default=_MISS)
+    if cached is not _MISS:
+        return cached
 
-        client = OpenAI(**client_kwargs)
+    try:
+        # 获取共享的OpenAI客户端
+        client = get_client(openai_api_key, api_base)
 
         # 调用API
         response = client.chat.completions.create(
@@ -134,17 +352,331 @@ def process_with_openai(text, prompt_template, openai_api_key, model_name="gpt-3
                 {"role": "user", "content": prompt}
             ],
             temperature=1.3,  # 使用相同的temperature值
-            max_tokens=8192
+            max_tokens=max_tokens
         )
 
-        # 提取结果
+        # 提取结果，因达到 max_tokens 被截断的结果不写入缓存
         result_text = response.choices[0].message.content.strip()
+        if response.choices[0].finish_reason == "length":
+            print(f"生成结果达到 max_tokens={max_tokens} 被截断，不写入缓存")
+        else:
+            cache.set(cache_key, result_text, expire=LLM_CACHE_EXPIRE)
         return result_text
     except Exception as e:
         print(f"处理文本时出现错误: {e}")
         return f"处理失败: {str(e)}"
 
 
+class RateLimiter:
+    """
+    令牌桶限流器，同时限制每分钟请求数 (RPM) 和每分钟token数 (TPM)
+
+    两个桶每秒按额度的1/60补充，rpm或tpm为0表示该维度不限制
+    """
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm or float('inf')
+        self.tpm = tpm or float('inf')
+        self.available_requests = self.rpm
+        self.available_tokens = self.tpm
+        self._cond = None
+        self._refill_task = None
+
+    async def _refill(self):
+        while True:
+            await asyncio.sleep(1)
+            async with self._cond:
+                self.available_requests = min(
+                    self.rpm, self.available_requests + self.rpm / 60)
+                self.available_tokens = min(
+                    self.tpm, self.available_tokens + self.tpm / 60)
+                self._cond.notify_all()
+
+    async def acquire(self, est_tokens):
+        """
+        等待直到有足够的请求额度和token额度，然后扣除
+        """
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+            self._refill_task = asyncio.create_task(self._refill())
+
+        # 单个请求的估计值不能超过桶容量，否则永远无法满足
+        est_tokens = min(est_tokens, self.tpm)
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self.available_requests >= 1 and self.available_tokens >= est_tokens)
+            self.available_requests -= 1
+            self.available_tokens -= est_tokens
+
+    def close(self):
+        """
+        停止后台补充任务
+        """
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+        self._cond = None
+        self._refill_task = None
+
+
+def get_async_client(openai_api_key, api_base=None):
+    """
+    获取共享的AsyncOpenAI客户端，相同配置只创建一次
+
+    关闭SDK自带的重试，由 _process_with_openai_async 统一退避重试，确保每次请求都经过限流器
+    """
+    key = (openai_api_key, api_base)
+    if key not in _async_client_cache:
+        client_kwargs = {"api_key": openai_api_key, "max_retries": 0}
+        if api_base:
+            client_kwargs["base_url"] = api_base
+        _async_client_cache[key] = AsyncOpenAI(**client_kwargs)
+    return _async_client_cache[key]
+
+
+async def process_with_openai_async(text, prompt_template, openai_api_key, model_name="gpt-3.5-turbo", api_base=None, rate_limiter=None, max_retries=3, max_tokens=1024, response_format=None, raise_errors=False):
+    """
+    process_with_openai 的异步版本，复用共享客户端，便于并发处理多篇论文
+
+    相同 (模型, 模板, 文本) 的并发请求会合并为一次，后到的调用直接等待进行中的结果
+
+    参数在 process_with_openai 的基础上增加:
+    rate_limiter (RateLimiter, optional): 请求前需要获取额度的限流器
+    max_retries (int): 遇到429速率限制、连接错误或5xx错误时的最大尝试次数
+    max_tokens (int): 生成的最大token数
+    response_format (dict, optional): 传给API的输出格式，如 {"type": "json_object"}
+    raise_errors (bool): 为 True 时请求失败直接抛出异常，而不是返回"处理失败"文本
+
+    返回:
+    str: 处理后的文本
+    """
+    key = llm_cache_key(model_name, prompt_template, text)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_process_with_openai_async(
+            text, prompt_template, openai_api_key, model_name, api_base,
+            rate_limiter, max_retries, max_tokens, response_format))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    try:
+        # shield 保证某个调用方被取消时，不会连带取消其他调用方共享的请求
+        return await asyncio.shield(task)
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"处理文本时出现错误: {e}")
+        return f"处理失败: {str(e)}"
+
+
+async def _process_with_openai_async(text, prompt_template, openai_api_key, model_name, api_base, rate_limiter, max_retries, max_tokens, response_format):
+    """
+    实际执行单次AI处理：先查磁盘缓存，未命中时经限流器请求API，失败时抛出异常
+    """
+    prompt = prompt_template.format(text=text)
+
+    cache = get_llm_cache()
+    cache_key = llm_cache_key(model_name, prompt_template, text)
+    cached = cache.get(cache_key, default=_MISS)
+    if cached is not _MISS:
+        return cached
+
+    request_kwargs = {}
+    if response_format:
+        request_kwargs["response_format"] = response_format
+
+    client = get_async_client(openai_api_key, api_base)
+
+    for attempt in range(max_retries):
+        if rate_limiter is not None:
+            await rate_limiter.acquire(len(prompt) // 4 + max_tokens)
+
+        try:
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=1.3,
+                max_tokens=max_tokens,
+                stream=True,
+                **request_kwargs
+            )
+            break
+        except (RateLimitError, APIConnectionError, InternalServerError) as e:
+            if attempt == max_retries - 1:
+                raise
+            # 指数退避并加入随机抖动，避免所有任务同时重试
+            wait = 2 ** attempt + random.random()
+            print(f"请求失败 ({type(e).__name__})，{wait:.1f} 秒后重试...")
+            await asyncio.sleep(wait)
+
+    # 流式接收生成结果，边收边累积，并记录最后的结束原因
+    buf = []
+    finish_reason = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            buf.append(choice.delta.content)
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+
+    result_text = "".join(buf).strip()
+    # 因达到 max_tokens 被截断的结果不写入缓存，避免以后的运行一直返回不完整的内容
+    if finish_reason == "length":
+        print(f"生成结果达到 max_tokens={max_tokens} 被截断，不写入缓存")
+    else:
+        cache.set(cache_key, result_text, expire=LLM_CACHE_EXPIRE)
+    return result_text
+
+
+def translation_max_tokens(text):
+    """
+    根据原文长度估算翻译所需的最大token数，避免按上限预留过多的TPM额度
+    """
+    return min(1024, max(128, len(text) // 2))
+
+
+def parse_combined_result(result):
+    """
+    解析合并提示词返回的JSON，格式为 {"zh": 中文摘要, "contribution": 贡献要点}
+
+    返回:
+    tuple: (translated_summary, contribution_summary)，解析失败时返回None
+    """
+    try:
+        data = json.loads(result)
+    except ValueError:
+        return None
+
+    if not isinstance(data, dict):
+        return None
+    translated_summary = data.get('zh')
+    contribution_summary = data.get('contribution')
+    if not isinstance(translated_summary, str) or not isinstance(contribution_summary, str):
+        return None
+    return translated_summary.strip(), contribution_summary.strip()
+
+
+def translate_locally(texts, model_dir, batch_size=8):
+    """
+    使用本地 ONNX 翻译模型（如 INT8 量化的 opus-mt-en-zh）批量翻译摘要
+
+    依赖 optimum[onnxruntime] 和 transformers，只在启用本地翻译时才导入
+
+    参数:
+    texts (list): 要翻译的英文文本列表
+    model_dir (str): 由 optimum 导出的 ONNX 模型目录，需包含分词器文件
+    batch_size (int): 每批翻译的文本数
+
+    返回:
+    list: 与texts一一对应的中文翻译
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import MarianTokenizer
+
+    tokenizer = MarianTokenizer.from_pretrained(model_dir)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir, provider="CPUExecutionProvider")
+
+    translations = []
+    for i in range(0, len(texts), batch_size):
+        batch = tokenizer(texts[i:i + batch_size], return_tensors="pt",
+                          padding=True, truncation=True)
+        outputs = model.generate(**batch, max_new_tokens=1024)
+        translations.extend(
+            text.strip() for text in tokenizer.batch_decode(outputs, skip_special_tokens=True))
+    return translations
+
+
+async def process_papers_async(papers, combined_prompt, translation_prompt, contribution_prompt, openai_api_key, model_name="gpt-3.5-turbo", api_base=None, concurrency=10, rate_limiter=None, local_translation_model=None):
+    """
+    并发地为每篇论文翻译摘要并生成贡献要点
+
+    每篇论文先用合并提示词在一次请求中同时获取两项结果，JSON解析失败时
+    退回到翻译和贡献要点各请求一次。指定本地翻译模型时，摘要在本地翻译，
+    AI只用于生成贡献要点
+
+    参数:
+    papers (list): 论文字典列表
+    combined_prompt (str): 要求返回JSON的合并提示词模板
+    translation_prompt (str): 翻译提示词模板
+    contribution_prompt (str): 贡献要点提示词模板
+    openai_api_key (str): OpenAI API密钥
+    model_name (str): 使用的模型名称
+    api_base (str, optional): 自定义API基础URL
+    concurrency (int): 同时进行的最大请求数
+    rate_limiter (RateLimiter, optional): 共享的RPM/TPM限流器
+    local_translation_model (str, optional): 本地 ONNX 翻译模型目录
+
+    返回:
+    list: 与papers一一对应的 (translated_summary, contribution_summary) 列表
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with sem:
+            return await coro
+
+    def translate(text):
+        return bounded(process_with_openai_async(
+            text, translation_prompt, openai_api_key, model_name, api_base, rate_limiter,
+            max_tokens=translation_max_tokens(text)))
+
+    def contribute(text):
+        return bounded(process_with_openai_async(
+            text, contribution_prompt, openai_api_key, model_name, api_base, rate_limiter,
+            max_tokens=CONTRIBUTION_MAX_TOKENS))
+
+    async def process_paper(paper):
+        text = paper['summary'][:MAX_ABSTRACT_CHARS]
+
+        try:
+            result = await bounded(process_with_openai_async(
+                text, combined_prompt, openai_api_key, model_name, api_base, rate_limiter,
+                max_tokens=translation_max_tokens(text) + CONTRIBUTION_MAX_TOKENS,
+                response_format={"type": "json_object"}, raise_errors=True))
+        except BadRequestError as e:
+            # 部分兼容接口或模型不支持 response_format，改为分别请求
+            print(f"合并请求被拒绝，分别处理: {paper['title']} ({e})")
+            return tuple(await asyncio.gather(translate(text), contribute(text)))
+        except Exception as e:
+            # 请求本身失败（如重试后仍被限流）时不再追加请求，避免重试风暴
+            print(f"处理文本时出现错误: {e}")
+            return f"处理失败: {str(e)}", f"处理失败: {str(e)}"
+
+        parsed = parse_combined_result(result)
+        if parsed is not None:
+            return parsed
+
+        # 请求成功但返回的不是有效JSON时，才退回到分别请求
+        print(f"合并请求结果解析失败，分别处理: {paper['title']}")
+        return tuple(await asyncio.gather(translate(text), contribute(text)))
+
+    async def process_with_local_translation():
+        texts = [paper['summary'][:MAX_ABSTRACT_CHARS] for paper in papers]
+
+        # 本地翻译在线程中进行，同时并发请求贡献要点
+        contributions = asyncio.gather(*[contribute(text) for text in texts])
+        try:
+            translations = await asyncio.to_thread(
+                translate_locally, texts, local_translation_model)
+        except Exception as e:
+            print(f"本地翻译失败，改用AI翻译: {e}")
+            translations = await asyncio.gather(*[translate(text) for text in texts])
+
+        return list(zip(translations, await contributions))
+
+    try:
+        if local_translation_model:
+            return await process_with_local_translation()
+        return await asyncio.gather(*[process_paper(paper) for paper in papers])
+    finally:
+        if rate_limiter is not None:
+            rate_limiter.close()
+
+
 def format_paper_for_email(paper, translated_summary=None, contribution_summary=None):
     """
     格式化论文信息为邮件内容的一部分，使用简洁清晰的格式
@@ -168,36 +700,36 @@ def format_paper_for_email(paper, translated_summary=None, contribution_summary=
     # 格式化分类列表 - 添加错误处理
     categories_str = ", ".join(paper.get('categories', ["未知分类"]))
 
-    # 构建格式化的论文信息
-    paper_info = f"{separator}"
-    paper_info += f"📄 标题: {paper['title']}\n"
-    paper_info += f"👥 作者: {authors_str}\n"
-    paper_info += f"🏷️ 分类: {categories_str}\n"
-    paper_info += f"📅 发布日期: {paper['pub_date']}\n"
+    # 构建格式化的论文信息，先收集各部分再一次性拼接
+    parts = [separator]
+    parts.append(f"📄 标题: {paper['title']}\n")
+    parts.append(f"👥 作者: {authors_str}\n")
+    parts.append(f"🏷️ 分类: {categories_str}\n")
+    parts.append(f"📅 发布日期: {paper['pub_date']}\n")
 
     # 添加评论信息 (如果有)
     if paper.get('comments'):
-        paper_info += f"💬 评论: {paper['comments']}\n"
+        parts.append(f"💬 评论: {paper['comments']}\n")
 
-    paper_info += f"🔗 ArXiv链接: https://arxiv.org/abs/{paper['arxiv_id']}\n"
-    paper_info += f"📄 PDF下载: https://arxiv.org/pdf/{paper['arxiv_id']}.pdf\n\n"
+    parts.append(f"🔗 ArXiv链接: https://arxiv.org/abs/{paper['arxiv_id']}\n")
+    parts.append(f"📄 PDF下载: https://arxiv.org/pdf/{paper['arxiv_id']}.pdf\n\n")
 
     # 如果有一句话贡献总结，添加到内容中
     if contribution_summary:
-        paper_info += f"{star_line}贡献要点{end_star_line}\n"
-        paper_info += f"{contribution_summary}\n\n"
+        parts.append(f"{star_line}贡献要点{end_star_line}\n")
+        parts.append(f"{contribution_summary}\n\n")
 
-    paper_info += f"{star_line}摘要{end_star_line}\n"
-    paper_info += f"{paper['summary']}\n\n"
+    parts.append(f"{star_line}摘要{end_star_line}\n")
+    parts.append(f"{paper['summary']}\n\n")
 
     # 如果有翻译的摘要，添加到内容中
     if translated_summary:
-        paper_info += f"{star_line}中文摘要{end_star_line}\n"
-        paper_info += f"{translated_summary}\n\n"
+        parts.append(f"{star_line}中文摘要{end_star_line}\n")
+        parts.append(f"{translated_summary}\n\n")
 
-    paper_info += f"{separator}\n"
+    parts.append(f"{separator}\n")
 
-    return paper_info
+    return "".join(parts)
 
 
 def send_email(subject, content, sender_email, sender_password, receiver_emails, sender_name=None, smtp_server='smtp.qq.com', smtp_port=465):
@@ -214,8 +746,8 @@ def send_email(subject, content, sender_email, sender_password, receiver_emails,
     smtp_server (str): SMTP服务器地址
     smtp_port (int): SMTP服务器端口
     """
-    # 创建邮件对象
-    message = MIMEMultipart()
+    # 创建邮件对象，纯文本内容直接使用MIMEText，无需多部分结构
+    message = MIMEText(content, 'plain', 'utf-8')
 
     # 设置发件人，使用email.utils格式化发件人地址
     if sender_name:
@@ -233,9 +765,6 @@ def send_email(subject, content, sender_email, sender_password, receiver_emails,
 
     message['Subject'] = Header(subject, 'utf-8')
 
-    # 添加邮件内容
-    message.attach(MIMEText(content, 'plain', 'utf-8'))
-
     try:
         # 连接到SMTP服务器
         # 注意QQ邮箱使用SSL连接，所以使用SMTP_SSL而不是SMTP
@@ -244,7 +773,7 @@ def send_email(subject, content, sender_email, sender_password, receiver_emails,
         server.login(sender_email, sender_password)
 
         # 发送邮件
-        server.sendmail(sender_email, recipients, message.as_string())
+        server.sendmail(sender_email, recipients, message.as_bytes())
         print(f"邮件已成功发送至 {', '.join(recipients)}")
 
         # 关闭连接
@@ -267,6 +796,14 @@ if __name__ == '__main__':
     OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "deepseek-chat")
     OPENAI_API_BASE = os.environ.get(
         "OPENAI_API_BASE", "https://api.deepseek.com/v1")
+    # 同时进行的最大AI请求数
+    LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "10"))
+    # 每分钟最大请求数和token数，0表示不限制
+    LLM_RPM = int(os.environ.get("LLM_RPM", "0"))
+    LLM_TPM = int(os.environ.get("LLM_TPM", "0"))
+
+    # 本地 ONNX 翻译模型目录，设置后摘要在本地翻译，AI只生成贡献要点
+    LOCAL_TRANSLATION_MODEL = os.environ.get("LOCAL_TRANSLATION_MODEL")
 
     # 定义提示词模板
     TRANSLATION_PROMPT = """我将给你一个人工智能领域的论文摘要，你需要翻译成中文，注意通顺流畅，领域专有用语（如transformer, token, logit）不用翻译。
@@ -275,6 +812,14 @@ if __name__ == '__main__':
     CONTRIBUTION_PROMPT = """我将给你一个人工智能领域的论文摘要，你需要使用中文，将最核心的内容用一句话说明，一般格式为：用了什么办法解决了什么问题。注意通顺流畅，领域专有用语（如transformer, token, logit）不用翻译。
 {text}"""
 
+    # 合并提示词，一次请求同时得到中文摘要和贡献要点
+    COMBINED_PROMPT = """我将给你一个人工智能领域的论文摘要，请以JSON格式返回，包含两个键：
+"zh": 摘要的中文翻译，注意通顺流畅，领域专有用语（如transformer, token, logit）不用翻译；
+"contribution": 使用中文将最核心的内容用一句话说明，一般格式为：用了什么办法解决了什么问题。
+示例: {{"zh": "...", "contribution": "..."}}
+摘要：
+{text}"""
+
     # 从环境变量获取关键词列表
     search_terms_str = os.environ.get(
         "SEARCH_TERMS", '"transformer","large language model"')
@@ -284,6 +829,9 @@ if __name__ == '__main__':
     # 获取的最大论文数
     max_results = int(os.environ.get("MAX_RESULTS", "10"))
 
+    # 是否只保留前一天提交的论文
+    filter_by_date = os.environ.get("FILTER_BY_DATE", "false").lower() == "true"
+
     # 获取前一天的日期
     yesterday = get_yesterday()
 
@@ -292,12 +840,14 @@ if __name__ == '__main__':
     # 用于存储每个关键词找到的论文ID列表
     keyword_papers = {}
 
-    # 遍历每个关键词进行搜索
-    for search_term in search_terms:
-        print(f"搜索关键词 '{search_term}' 在 {yesterday} 发布的论文...")
+    # 在 arxiv 按照关键词并发查找前一天的论文
+    print(f"搜索关键词 {', '.join(search_terms)} 在 {yesterday} 发布的论文...")
+    search_results = asyncio.run(
+        search_all_terms_async(search_terms, yesterday, max_results, date_filter=filter_by_date))
 
-        # 在 arxiv 按照关键词查找前一天的论文
-        papers = search_arxiv_papers(search_term, yesterday, max_results)
+    # 遍历每个关键词的搜索结果
+    for search_term in search_terms:
+        papers = search_results[search_term]
 
         if not papers:
             print(f"没有找到{yesterday}发布的含 '{search_term}' 的论文")
@@ -319,18 +869,18 @@ if __name__ == '__main__':
         print(f"没有找到{yesterday}发布的符合任何关键词的论文，将发送空结果邮件")
 
         # 创建一个没有找到论文的邮件内容，使用简单格式
-        email_content = f"""【ArXiv论文日报】{yesterday}
+        chunks = [f"""【ArXiv论文日报】{yesterday}
 ==================================================
 
 📢 通知: 今日未找到符合以下关键词的论文:
 
-"""
+"""]
         # 添加所有搜索关键词，简单格式
-        for search_term in search_terms:
-            email_content += f"🔍 {search_term}\n"
+        chunks.extend(f"🔍 {search_term}\n" for search_term in search_terms)
 
-        email_content += f"\n📋 我们将继续监控这些关键词，有新论文发布时会及时通知您。\n"
-        email_content += f"==================================================\n"
+        chunks.append(f"\n📋 我们将继续监控这些关键词，有新论文发布时会及时通知您。\n")
+        chunks.append(f"==================================================\n")
+        email_content = "".join(chunks)
 
         # 发送邮件
         send_email(
@@ -349,22 +899,40 @@ if __name__ == '__main__':
 
     print(f"总共找到 {len(all_papers)} 篇不重复的论文")
 
-    # 创建一个简洁的邮件头部
-    email_content = f"""【ArXiv论文日报】{yesterday} 关键词: {', '.join(search_terms)}
+    # 创建一个简洁的邮件头部，各部分收集到列表中最后一次性拼接
+    chunks = [f"""【ArXiv论文日报】{yesterday} 关键词: {', '.join(search_terms)}
 ==================================================
 
 📊 总览:
   • 总共找到 {len(all_papers)} 篇{yesterday}发布的相关论文
 
-"""
+"""]
 
     # 为每个关键词添加找到的论文数量
     for search_term in search_terms:
         papers_count = len(keyword_papers[search_term])
         if papers_count > 0:
-            email_content += f"  • 关键词 {search_term}: {papers_count} 篇论文\n"
-
-    email_content += f"==================================================\n\n"
+            chunks.append(f"  • 关键词 {search_term}: {papers_count} 篇论文\n")
+
+    chunks.append(f"==================================================\n\n")
+
+    # 并发翻译摘要并生成贡献要点，每篇论文只处理一次
+    print(f"并发处理 {len(all_papers)} 篇论文 (并发数: {LLM_CONCURRENCY})...")
+    papers_list = list(all_papers.values())
+    ai_results = asyncio.run(process_papers_async(
+        papers_list,
+        COMBINED_PROMPT,
+        TRANSLATION_PROMPT,
+        CONTRIBUTION_PROMPT,
+        OPENAI_API_KEY,
+        OPENAI_MODEL,
+        OPENAI_API_BASE,
+        LLM_CONCURRENCY,
+        RateLimiter(LLM_RPM, LLM_TPM) if LLM_RPM or LLM_TPM else None,
+        LOCAL_TRANSLATION_MODEL
+    ))
+    processed = {paper['arxiv_id']: result
+                 for paper, result in zip(papers_list, ai_results)}
 
     # 为每个关键词部分添加标题，使用简单清晰的格式
     for search_term in search_terms:
@@ -372,42 +940,24 @@ if __name__ == '__main__':
         if not paper_ids:
             continue
 
-        email_content += f"""
+        chunks.append(f"""
 ==================================================
 🔎 关键词: {search_term} ({len(paper_ids)} 篇论文)
 ==================================================
-"""
+""")
 
         # 处理这个关键词下的每篇论文
         for i, arxiv_id in enumerate(paper_ids, 1):
             paper = all_papers[arxiv_id]
             print(
-                f"处理论文 {i}/{len(paper_ids)}: {paper['title']} (关键词: {search_term})")
-
-            # 翻译摘要
-            print(f"  - 翻译摘要...")
-            translated_summary = process_with_openai(
-                paper['summary'],
-                TRANSLATION_PROMPT,
-                OPENAI_API_KEY,
-                OPENAI_MODEL,
-                OPENAI_API_BASE
-            )
-
-            # 生成一句话贡献总结
-            print(f"  - 生成贡献要点...")
-            contribution_summary = process_with_openai(
-                paper['summary'],
-                CONTRIBUTION_PROMPT,
-                OPENAI_API_KEY,
-                OPENAI_MODEL,
-                OPENAI_API_BASE
-            )
+                f"整理论文 {i}/{len(paper_ids)}: {paper['title']} (关键词: {search_term})")
+            translated_summary, contribution_summary = processed[arxiv_id]
 
             # 格式化论文信息并添加到邮件内容
-            paper_section = format_paper_for_email(
-                paper, translated_summary, contribution_summary)
-            email_content += paper_section
+            chunks.append(format_paper_for_email(
+                paper, translated_summary, contribution_summary))
+
+    email_content = "".join(chunks)
 
     # 发送包含所有论文信息的邮件
     send_email(